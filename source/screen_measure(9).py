@@ -18,7 +18,8 @@
 # Run:     python screen_measure.py
 #
 from PySide6 import QtCore, QtGui, QtWidgets
-import math, csv, datetime, os
+import math, csv, datetime, os, bisect, itertools
+from array import array
 
 # Импорт ресурсов
 try:
@@ -27,19 +28,211 @@ except ImportError:
     # Если ресурсный файл не найден, создаем заглушку
     pass
 
+# ---------- polyline kernels ----------
+# Points are passed as flat image-space coordinates: x0, y0, x1, y1, ...
+def flat_xy(points) -> array:
+    """list[QPointF] -> array('d') of interleaved x, y."""
+    return array('d', itertools.chain.from_iterable((p.x(), p.y()) for p in points))
+
+def polyline_seglens(xy) -> list:
+    """Pixel length of each segment of a flat point array."""
+    xs, ys = xy[0::2], xy[1::2]
+    return [math.hypot(x2-x1, y2-y1) for x1, y1, x2, y2 in zip(xs, ys, xs[1:], ys[1:])]
+
+def polyline_length(xy) -> float:
+    return math.fsum(polyline_seglens(xy))
+
+def polyline_halfway(xy, seglens=None) -> QtCore.QPointF:
+    """Point halfway along the path; seglens may be passed in if already known."""
+    n = len(xy) // 2
+    if n == 1:
+        return QtCore.QPointF(xy[0], xy[1])
+    if seglens is None:
+        seglens = polyline_seglens(xy)
+    cum = list(itertools.accumulate(seglens))
+    total = cum[-1]
+    if total <= 0.0:
+        return QtCore.QPointF((xy[0] + xy[-2]) * 0.5, (xy[1] + xy[-1]) * 0.5)
+    half = total / 2.0
+    i = bisect.bisect_left(cum, half)  # first segment whose end reaches the halfway mark
+    ax, ay, bx, by = xy[2*i:2*i+4]
+    remain = half - (cum[i] - seglens[i])
+    t = remain / seglens[i] if seglens[i] > 0 else 0.5
+    return QtCore.QPointF(ax + (bx-ax)*t, ay + (by-ay)*t)
+
+# ---------- labels ----------
+_label_font = None
+_label_metrics = None
+
+def label_font():
+    """Shared 10pt label font and its metrics (created on first use, after QApplication)."""
+    global _label_font, _label_metrics
+    if _label_font is None:
+        _label_font = QtGui.QFont()
+        _label_font.setPointSizeF(10)
+        _label_metrics = QtGui.QFontMetrics(_label_font)
+    return _label_font, _label_metrics
+
+def label_shape(text: str):
+    """Rounded background path and box of a label, relative to its anchor (bottom-left)."""
+    _, metrics = label_font()
+    w = metrics.horizontalAdvance(text) + 8
+    h = metrics.height() + 2
+    rect = QtCore.QRectF(0, -h, w, h)
+    path = QtGui.QPainterPath()
+    path.addRoundedRect(rect, 4, 4)
+    return path, rect
+
 class MeasureItem:
     def __init__(self, kind, points, length_units_str, length_value, units, timestamp=None):
         self.kind = kind                  # 'line' | 'polyline'
-        self.points = points[:]           # list[QPointF] in image coordinates
+        self.xy = flat_xy(points)         # array('d') x0,y0,x1,y1,... in image coordinates
         self.length_units_str = length_units_str
         self.length_value = float(length_value)
         self.units = units
         self.timestamp = timestamp or datetime.datetime.now()
+        self._ts_str = self.timestamp.strftime("%H:%M:%S")
+        self._display_text = None         # history list row, reset when the length text changes
+        self._seglens = None              # memoised segment lengths (points never change)
+        self._label_cache = None          # (text, QPainterPath, QRectF), see ImageView._drawItemLabel
+        self._poly = None                 # memoised image-space QPolygonF
+
+    def count(self) -> int:
+        return len(self.xy) // 2
+
+    def displayText(self) -> str:
+        if self._display_text is None:
+            self._display_text = f"[{self._ts_str}] {self.kind}: {self.length_units_str} ({self.count()} pts)"
+        return self._display_text
+
+    def qpoints(self) -> list:
+        xy = self.xy
+        return [QtCore.QPointF(xy[j], xy[j+1]) for j in range(0, len(xy), 2)]
+
+    def polygon(self) -> QtGui.QPolygonF:
+        # built once; the painter transform maps it to the view on every zoom/pan
+        if self._poly is None:
+            self._poly = QtGui.QPolygonF(self.qpoints())
+        return self._poly
+
+    def drawable(self) -> bool:
+        n = self.count()
+        return (self.kind == 'line' and n == 2) or (self.kind == 'polyline' and n >= 2)
+
+    def segLengths(self) -> list:
+        if self._seglens is None:
+            self._seglens = polyline_seglens(self.xy)
+        return self._seglens
+
+    def pxLength(self) -> float:
+        return math.fsum(self.segLengths())
+
+# ---------- history model ----------
+class HistoryModel(QtCore.QAbstractListModel):
+    """List model over ImageView.history; all history mutations go through it."""
+    def __init__(self, history: list, parent=None):
+        super().__init__(parent)
+        self._history = history    # shared with ImageView.history, never rebound
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self._history)
+
+    def data(self, index, role=QtCore.Qt.ItemDataRole.DisplayRole):
+        if role == QtCore.Qt.ItemDataRole.DisplayRole and index.isValid():
+            return self._history[index.row()].displayText()
+        return None
+
+    def append(self, item: 'MeasureItem'):
+        n = len(self._history)
+        self.beginInsertRows(QtCore.QModelIndex(), n, n)
+        self._history.append(item)
+        self.endInsertRows()
+
+    def removeIndices(self, rows: list):
+        # rows ascending and unique
+        first, last = rows[0], rows[-1]
+        if last - first + 1 == len(rows):
+            # one contiguous span (undo, shift-selection): a single row removal
+            self.beginRemoveRows(QtCore.QModelIndex(), first, last)
+            del self._history[first:last + 1]
+            self.endRemoveRows()
+            return
+        # scattered rows: rebuild the list in one pass instead of shifting it once per span
+        drop = set(rows)
+        self.beginResetModel()
+        self._history[:] = [item for i, item in enumerate(self._history) if i not in drop]
+        self.endResetModel()
+
+    def clear(self):
+        self.beginResetModel()
+        self._history.clear()
+        self.endResetModel()
+
+    def refresh(self):
+        # row text changed in place (recalibration)
+        if self._history:
+            self.dataChanged.emit(self.index(0), self.index(len(self._history) - 1),
+                                  [QtCore.Qt.ItemDataRole.DisplayRole])
+
+# ---------- signal helpers ----------
+class Throttler(QtCore.QObject):
+    """Calls func at most once per interval: the first call runs at once, the last one in the window when it ends."""
+    def __init__(self, func, interval=33, parent=None):
+        super().__init__(parent)
+        self._func = func
+        self._args = None          # trailing-edge call, latest wins
+        self._timer = QtCore.QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setTimerType(QtCore.Qt.TimerType.CoarseTimer)
+        self._timer.setInterval(interval)
+        self._timer.timeout.connect(self._flush)
+
+    def trigger(self, *args):
+        if self._timer.isActive():
+            self._args = args
+            return
+        self._func(*args)
+        self._timer.start()
+
+    def _flush(self):
+        if self._args is not None:
+            args, self._args = self._args, None
+            self._func(*args)
+            self._timer.start()
+
+# ---------- background tasks ----------
+class TaskSignals(QtCore.QObject):
+    finished = QtCore.Signal(str)  # status message, delivered queued to the GUI thread
+
+class CsvExportTask(QtCore.QRunnable):
+    """Writes measurement rows to CSV on a QThreadPool worker."""
+    def __init__(self, path, rows, signals: TaskSignals):
+        super().__init__()
+        self.path = path
+        self.rows = rows          # (timestamp_iso, kind, units, length_value, label, xy)
+        self.signals = signals
+
+    def run(self):
+        try:
+            with open(self.path, 'w', newline='', encoding='utf-8') as f:
+                w = csv.writer(f, delimiter=';')
+                w.writerow(["timestamp","kind","units","length_value","length_label","points"])
+                for ts, kind, units, value, label, xy in self.rows:
+                    pts = "|".join([f"{x:.2f},{y:.2f}" for x, y in zip(xy[0::2], xy[1::2])])
+                    w.writerow([ts, kind, units, f"{value:.6f}", label, pts])
+        except OSError as e:
+            self.signals.finished.emit(f"Failed to export CSV: {e}")
+            return
+        self.signals.finished.emit(f"Exported {len(self.rows)} items to {os.path.basename(self.path)}")
 
 class ImageView(QtWidgets.QWidget):
     statusMessage  = QtCore.Signal(str)
     measureAdded   = QtCore.Signal(object)  # MeasureItem
     historyChanged = QtCore.Signal()
+    scaleChanged   = QtCore.Signal(float, str)  # units per px, units
+    statusShown    = QtCore.Signal(str)         # statusMessage throttled to ~30 Hz, for labels
+
+    SCALED_CACHE_MAX_PX = 4096 * 4096  # max device pixels kept in the zoomed image cache
 
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -48,37 +241,88 @@ class ImageView(QtWidgets.QWidget):
 
         # image & view state
         self.image = QtGui.QImage()
+        self._image_pixmap = QtGui.QPixmap()  # self.image as a pixmap, converted once per image
         self._zoom = 1.0
         self._pan  = QtCore.QPointF(0, 0)
+        self._inv_zoom = 1.0
+        self._img_to_view_xform = QtGui.QTransform()  # scale(zoom) then translate(pan), see _updateTransform
+        self._scaled_pm = None     # QPixmap of image at current zoom, see _drawImageLayer
+        self._scaled_key = None
         self._dragging = False
         self._drag_origin = QtCore.QPoint()
         self._pan_origin  = QtCore.QPointF(0, 0)
         self._space_down  = False
 
+        # pan coalescing: at most one repaint per display frame
+        self._repaint_timer = QtCore.QTimer(self)
+        self._repaint_timer.setSingleShot(True)
+        self._repaint_timer.setTimerType(QtCore.Qt.TimerType.CoarseTimer)
+        self._repaint_timer.setInterval(16)
+        self._repaint_timer.timeout.connect(self.update)
+        # one throttle timer shared by every status consumer (cursor read-out included)
+        self._status_throttle = Throttler(self.statusShown.emit, 33, self)
+        self.statusMessage.connect(self._status_throttle.trigger)
+
         # modes & temp
         self.mode = 'idle'         # 'idle'|'calibrate'|'line'|'polyline'
         self.temp_points = []      # list[QPointF] in image coords
+        self._last_temp_label = None  # (key, text), see _tempLabelText
 
         # calibration
         self.scale_units_per_px = 1.0
         self.units = 'px'
 
         # history
-        self.history = []          # list[MeasureItem]
+        self.history = []          # list[MeasureItem], mutated only through historyModel
+        self.historyModel = HistoryModel(self.history, self)
+        self._history_px = array('d')           # pixel length of each item
+        self._history_anchors = []              # image-space label anchor per item (or None)
+        self._history_lines = []                # image-space QLineF of all line items
+        self._history_polys = []                # image-space QPolygonF per polyline item
+        self._history_rev = 0                   # bumped on every history/label change
+
+        # painting
+        self._geom_dirty = True
+        self._temp_dirty = True
+        self._view_cache = {}      # view-space geometry, see _viewGeometry
+        self._history_pixmap = None  # background + image + history snapshot, see _historyLayer
+        self._history_key = None
 
         # guides
         self.guide_anchor_img = None
         self.guides_diag_enabled = True
         self.guide_h_enabled = True
         self.guide_v_enabled = True
+        self._guide_cache = None   # (key, QPixmap), see _drawGuides
+
+        # paint resources, built once instead of on every repaint
+        self._color_bg = QtGui.QColor(30, 30, 30)
+        # double-pass outline (black) + inner (cyan) for visibility
+        self._pen_outline = QtGui.QPen(QtGui.QColor(0,0,0,220), 4)
+        self._pen_outline.setCosmetic(True)
+        self._pen_inner = QtGui.QPen(QtGui.QColor(0, 200, 255), 2)
+        self._pen_inner.setCosmetic(True)
+        self._pen_guide_outer_thick, self._pen_guide_inner_thick = self._buildGuidePens(True)
+        self._pen_guide_outer_thin, self._pen_guide_inner_thin = self._buildGuidePens(False)
+        self._brush_handle = QtGui.QBrush(QtGui.QColor(0, 200, 255, 160))
+        self._brush_label_bg = QtGui.QBrush(QtGui.QColor(0,0,0,180))
+        self._pen_label_text = QtGui.QPen(QtGui.QColor(255,255,255))
+        self._font_label = label_font()[0]
 
     # ---------- image management ----------
     def setImage(self, img: QtGui.QImage):
-        self.image = img.copy()
+        # RGB32 / premultiplied ARGB32 are the raster engine's native formats: no per-blit conversion;
+        # opaque images stay opaque so exports do not gain an alpha channel
+        fmt = (QtGui.QImage.Format.Format_ARGB32_Premultiplied if img.hasAlphaChannel()
+               else QtGui.QImage.Format.Format_RGB32)
+        self.image = img.convertToFormat(fmt)
+        self._image_pixmap = QtGui.QPixmap.fromImage(self.image)
+        self._scaled_pm = None
         self._zoom = 1.0
         self._pan  = QtCore.QPointF(0, 0)
         self.temp_points.clear()
         self.guide_anchor_img = None
+        self._updateTransform()
         self.update()
         if not self.image.isNull():
             self.statusMessage.emit(f"Image loaded: {self.image.width()}x{self.image.height()} px")
@@ -96,16 +340,19 @@ class ImageView(QtWidgets.QWidget):
         return False
 
     # ---------- coordinates ----------
+    def _updateTransform(self):
+        # call after every _zoom/_pan change
+        z = self._zoom
+        self._inv_zoom = 1.0 / max(z, 1e-9)
+        self._img_to_view_xform = QtGui.QTransform(z, 0.0, 0.0, z, self._pan.x(), self._pan.y())
+        self._invalidateGeometry()
+
     def viewToImage(self, p: QtCore.QPointF) -> QtCore.QPointF:
-        inv = 1.0 / max(self._zoom, 1e-9)
-        x = (p.x() - self._pan.x()) * inv
-        y = (p.y() - self._pan.y()) * inv
-        return QtCore.QPointF(x, y)
+        inv = self._inv_zoom
+        return QtCore.QPointF((p.x() - self._pan.x()) * inv, (p.y() - self._pan.y()) * inv)
 
     def imageToView(self, p: QtCore.QPointF) -> QtCore.QPointF:
-        x = p.x() * self._zoom + self._pan.x()
-        y = p.y() * self._zoom + self._pan.y()
-        return QtCore.QPointF(x, y)
+        return self._img_to_view_xform.map(p)
 
     # ---------- helpers ----------
     def pxDistance(self, a: QtCore.QPointF, b: QtCore.QPointF) -> float:
@@ -115,57 +362,85 @@ class ImageView(QtWidgets.QWidget):
         return self.pxDistance(a, b) * self.scale_units_per_px
 
     # ---------- painting ----------
+    def resizeEvent(self, e: QtGui.QResizeEvent):
+        self._guide_cache = None
+        self._history_pixmap = None
+        super().resizeEvent(e)
+
     def paintEvent(self, e: QtGui.QPaintEvent):
         p = QtGui.QPainter(self)
-        p.fillRect(self.rect(), QtGui.QColor(30, 30, 30))
-
-        if not self.image.isNull():
-            target_rect = QtCore.QRectF(
-                self._pan,
-                QtCore.QSizeF(self.image.width()*self._zoom, self.image.height()*self._zoom)
-            )
-            p.drawImage(target_rect, self.image, QtCore.QRectF(self.image.rect()))
+        # honour partial invalidations (expose, overlapping dialogs): paint only e.rect()
+        clip = e.rect()
+        if clip != self.rect():
+            p.setClipRect(clip)
 
-        # persisted measurements
-        p.setRenderHints(QtGui.QPainter.Antialiasing | QtGui.QPainter.TextAntialiasing)
-        for item in self.history:
-            self._drawMeasuredItem(p, item)
+        # image + persisted measurements come from a snapshot; only temp items are live
+        p.drawPixmap(0, 0, self._historyLayer())
 
         # temp items (with outline)
-        pen_outline = QtGui.QPen(QtGui.QColor(0, 0, 0, 220), 4)
-        pen_outline.setCosmetic(True)
-        pen_temp = QtGui.QPen(QtGui.QColor(0, 200, 255), 2)
-        pen_temp.setCosmetic(True)
-
-        if self.temp_points:
-            for i, pt in enumerate(self.temp_points):
-                vpt = self.imageToView(pt)
-                self._drawHandle(p, vpt, label=str(i+1))
-
-            if self.mode in ('line', 'calibrate') and len(self.temp_points) == 2:
-                a, b = self.temp_points
-                p.setPen(pen_outline); self._drawSegment(p, a, b)
-                p.setPen(pen_temp);    self._drawSegment(p, a, b)
-                mid = (a + b) * 0.5
-                length_units = self.unitsDistance(a, b)
-                self._drawFloatingText(p, self.imageToView(mid) + QtCore.QPointF(6, -6), self._fmt_len(length_units))
-
-            elif self.mode == 'polyline' and len(self.temp_points) >= 2:
-                total = 0.0
-                for i in range(len(self.temp_points)-1):
-                    a, b = self.temp_points[i], self.temp_points[i+1]
-                    p.setPen(pen_outline); self._drawSegment(p, a, b)
-                    p.setPen(pen_temp);    self._drawSegment(p, a, b)
-                    total += self.unitsDistance(a, b)
-                self._drawFloatingText(p, self.imageToView(self.temp_points[-1]) + QtCore.QPointF(8, -8),
-                                       self._fmt_len(total))
+        p.setRenderHints(QtGui.QPainter.Antialiasing | QtGui.QPainter.TextAntialiasing)
+        self._drawMeasurements(p, self._viewGeometry(), history=False, handles=True)
 
         # guides: only in active modes and if we have an anchor
         if self.mode in ('calibrate','line','polyline') and self.guide_anchor_img is not None:
             thick = len(self.temp_points) > 0  # thick while placing points
             self._drawGuides(p, self.imageToView(self.guide_anchor_img), thick)
 
+    def _historyLayer(self) -> QtGui.QPixmap:
+        # snapshot of background + image + history; rebuilt when zoom, pan, size, image or history change
+        dpr = self.devicePixelRatioF()
+        key = (self._zoom, self._pan.x(), self._pan.y(), self.width(), self.height(), dpr,
+               self.image.cacheKey(), self._history_rev)
+        if self._history_pixmap is None or self._history_key != key:
+            self._history_pixmap = self._rebuildHistoryPixmap(dpr)
+            self._history_key = key
+        return self._history_pixmap
+
+    def _rebuildHistoryPixmap(self, dpr: float) -> QtGui.QPixmap:
+        pm = QtGui.QPixmap(max(1, round(self.width()*dpr)), max(1, round(self.height()*dpr)))
+        pm.setDevicePixelRatio(dpr)
+        hp = QtGui.QPainter(pm)
+        hp.fillRect(self.rect(), self._color_bg)
+        if not self.image.isNull():
+            self._drawImageLayer(hp)
+        hp.setRenderHints(QtGui.QPainter.Antialiasing | QtGui.QPainter.TextAntialiasing)
+        self._drawMeasurements(hp, self._viewGeometry(), temp=False)
+        hp.end()
+        return pm
+
+    def _drawImageLayer(self, painter):
+        # blit a pixmap pre-scaled to the current zoom instead of rescaling every frame
+        sw = round(self.image.width() * self._zoom)
+        sh = round(self.image.height() * self._zoom)
+        dpr = self.devicePixelRatioF()
+        if sw * sh * dpr * dpr <= self.SCALED_CACHE_MAX_PX:
+            key = (self._zoom, dpr)
+            if self._scaled_pm is None or self._scaled_key != key:
+                if key == (1.0, 1.0):
+                    pm = self._image_pixmap
+                else:
+                    pm = self._image_pixmap.scaled(
+                        max(1, round(sw*dpr)), max(1, round(sh*dpr)),
+                        QtCore.Qt.AspectRatioMode.IgnoreAspectRatio,
+                        QtCore.Qt.TransformationMode.FastTransformation)
+                    pm.setDevicePixelRatio(dpr)
+                self._scaled_pm, self._scaled_key = pm, key
+            painter.drawPixmap(self._pan, self._scaled_pm)
+            return
+        # too large to cache at this zoom: scale only the visible part of the image
+        visible = QtCore.QRectF(self.viewToImage(QtCore.QPointF(0, 0)),
+                                self.viewToImage(QtCore.QPointF(self.width(), self.height())))
+        visible = visible.intersected(QtCore.QRectF(self.image.rect()))
+        if not visible.isEmpty():
+            target = QtCore.QRectF(self.imageToView(visible.topLeft()), self.imageToView(visible.bottomRight()))
+            painter.drawPixmap(target, self._image_pixmap, visible)
+
     def _makeGuidePens(self, thick: bool):
+        if thick:
+            return self._pen_guide_outer_thick, self._pen_guide_inner_thick
+        return self._pen_guide_outer_thin, self._pen_guide_inner_thin
+
+    def _buildGuidePens(self, thick: bool):
         # base widths (thick mode = current look)
         outer_thick = 4.0
         inner_thick = 2.0
@@ -186,103 +461,187 @@ class ImageView(QtWidgets.QWidget):
         return pen_outer, pen_inner
 
     def _drawGuides(self, painter: QtGui.QPainter, anchor_view: QtCore.QPointF, thick: bool):
-        pen_outer, pen_inner = self._makeGuidePens(thick)
+        # dashed strokes are rendered once into a transparent pixmap and re-blitted
+        # until the anchor, pen width, widget size, device pixel ratio or enabled guides change
         w, h = self.width(), self.height()
+        dpr = self.devicePixelRatioF()
+        key = (int(anchor_view.x()), int(anchor_view.y()), thick, w, h, dpr,
+               self.guide_h_enabled, self.guide_v_enabled, self.guides_diag_enabled)
+        if self._guide_cache is None or self._guide_cache[0] != key:
+            pm = QtGui.QPixmap(max(1, round(w*dpr)), max(1, round(h*dpr)))
+            pm.setDevicePixelRatio(dpr)
+            pm.fill(QtCore.Qt.GlobalColor.transparent)
+            gp = QtGui.QPainter(pm)
+            gp.setRenderHints(QtGui.QPainter.Antialiasing)
+            self._paintGuides(gp, anchor_view, thick, w, h)
+            gp.end()
+            self._guide_cache = (key, pm)
+        painter.drawPixmap(0, 0, self._guide_cache[1])
+
+    def _paintGuides(self, painter: QtGui.QPainter, anchor_view: QtCore.QPointF, thick: bool, w: int, h: int):
+        pen_outer, pen_inner = self._makeGuidePens(thick)
+        ax, ay = int(anchor_view.x()), int(anchor_view.y())
 
+        lines = []
         # Horizontal
         if self.guide_h_enabled:
-            painter.setPen(pen_outer); painter.drawLine(0, int(anchor_view.y()), w, int(anchor_view.y()))
-            painter.setPen(pen_inner); painter.drawLine(0, int(anchor_view.y()), w, int(anchor_view.y()))
+            lines.append(QtCore.QLine(0, ay, w, ay))
         # Vertical
         if self.guide_v_enabled:
-            painter.setPen(pen_outer); painter.drawLine(int(anchor_view.x()), 0, int(anchor_view.x()), h)
-            painter.setPen(pen_inner); painter.drawLine(int(anchor_view.x()), 0, int(anchor_view.x()), h)
-
+            lines.append(QtCore.QLine(ax, 0, ax, h))
+        # 45° diagonals
         if self.guides_diag_enabled:
             L = max(w, h) * 2
-            painter.setPen(pen_outer); painter.drawLine(int(anchor_view.x()-L), int(anchor_view.y()-L),
-                                                        int(anchor_view.x()+L), int(anchor_view.y()+L))
-            painter.setPen(pen_inner); painter.drawLine(int(anchor_view.x()-L), int(anchor_view.y()-L),
-                                                        int(anchor_view.x()+L), int(anchor_view.y()+L))
-            painter.setPen(pen_outer); painter.drawLine(int(anchor_view.x()-L), int(anchor_view.y()+L),
-                                                        int(anchor_view.x()+L), int(anchor_view.y()-L))
-            painter.setPen(pen_inner); painter.drawLine(int(anchor_view.x()-L), int(anchor_view.y()+L),
-                                                        int(anchor_view.x()+L), int(anchor_view.y()-L))
+            lines.append(QtCore.QLine(ax-L, ay-L, ax+L, ay+L))
+            lines.append(QtCore.QLine(ax-L, ay+L, ax+L, ay-L))
+
+        # all outer strokes first, then all inner strokes on top
+        if lines:
+            painter.setPen(pen_outer); painter.drawLines(lines)
+            painter.setPen(pen_inner); painter.drawLines(lines)
 
     def _drawHandle(self, painter, view_pt: QtCore.QPointF, label=None):
         r = 5
-        painter.setBrush(QtGui.QColor(0, 200, 255, 160))
+        painter.setBrush(self._brush_handle)
         painter.setPen(QtCore.Qt.NoPen)
         painter.drawEllipse(QtCore.QRectF(view_pt.x()-r, view_pt.y()-r, 2*r, 2*r))
         if label:
             self._drawFloatingText(painter, view_pt + QtCore.QPointF(8, -8), label)
 
-    def _drawSegment(self, painter, a_img: QtCore.QPointF, b_img: QtCore.QPointF):
-        a = self.imageToView(a_img)
-        b = self.imageToView(b_img)
-        painter.drawLine(QtCore.QLineF(a, b))
+    def _invalidateGeometry(self):
+        # zoom/pan/history changed: labels and temp points must be re-mapped
+        self._geom_dirty = True
+        self._temp_dirty = True
 
-    def _drawMeasuredItem(self, painter, item: 'MeasureItem'):
-        # double-pass outline (black) + inner (cyan) for visibility
-        outline = QtGui.QPen(QtGui.QColor(0,0,0,220), 4)
-        outline.setCosmetic(True)
-        inner = QtGui.QPen(QtGui.QColor(0, 200, 255), 2)
-        inner.setCosmetic(True)
-
-        if item.kind == 'line' and len(item.points) == 2:
-            a, b = item.points
-            painter.setPen(outline); self._drawSegment(painter, a, b)
-            painter.setPen(inner);   self._drawSegment(painter, a, b)
-            mid = (a + b) * 0.5
-            self._drawFloatingText(painter, self.imageToView(mid) + QtCore.QPointF(6, -6), item.length_units_str)
-
-        elif item.kind == 'polyline' and len(item.points) >= 2:
-            pts = item.points
-            for i in range(len(pts)-1):
-                a, b = pts[i], pts[i+1]
-                painter.setPen(outline); self._drawSegment(painter, a, b)
-                painter.setPen(inner);   self._drawSegment(painter, a, b)
-            half_pt = self._polyline_halfway_point(pts)
-            self._drawFloatingText(painter, self.imageToView(half_pt) + QtCore.QPointF(6, -6), item.length_units_str)
-
-    def _polyline_halfway_point(self, pts):
-        if len(pts) == 1:
-            return pts[0]
-        seglens = []
-        total = 0.0
-        for i in range(len(pts)-1):
-            d = self.pxDistance(pts[i], pts[i+1])
-            seglens.append(d)
-            total += d
-        if total <= 0.0:
-            return (pts[0] + pts[-1]) * 0.5
-        half = total / 2.0
-        acc = 0.0
-        for i in range(len(pts)-1):
-            a, b = pts[i], pts[i+1]
-            if acc + seglens[i] >= half:
-                remain = half - acc
-                t = remain / seglens[i] if seglens[i] > 0 else 0.5
-                return QtCore.QPointF(a.x() + (b.x()-a.x())*t, a.y() + (b.y()-a.y())*t)
-            acc += seglens[i]
-        return (pts[0] + pts[-1]) * 0.5
-
-    def _drawFloatingText(self, painter, view_pt: QtCore.QPointF, text: str):
-        font = painter.font()
-        font.setPointSizeF(10)
-        painter.setFont(font)
+    def _invalidateTemp(self):
+        self._temp_dirty = True
+
+    def _syncHistoryArrays(self):
+        # flatten history once per mutation; segments stay in image space and are
+        # mapped by the painter transform, so zoom/pan never touch them
+        lines, polys, lengths, anchors = [], [], [], []
+        for item in self.history:
+            if item.kind == 'polyline':
+                if item.drawable():
+                    polys.append(item.polygon())
+            else:
+                self._itemLines(item, lines)
+            lengths.append(item.pxLength() if item.drawable() else 0.0)
+            anchors.append(self._labelAnchor(item))
+        self._history_px = array('d', lengths)
+        self._history_anchors = anchors
+        self._history_polys = polys
+        self._history_lines = lines
+        self._history_rev += 1
+        self._invalidateGeometry()
+
+    def _viewGeometry(self) -> dict:
+        # view-space label anchors (after zoom/pan/history changes) and temp geometry (after temp changes);
+        # each point set is mapped with a single QTransform.map(QPolygonF) call
+        cache = self._view_cache
+        if self._geom_dirty:
+            xform = self._img_to_view_xform * QtGui.QTransform.fromTranslate(6, -6)
+            mapped = iter(xform.map(QtGui.QPolygonF([a for a in self._history_anchors if a is not None])))
+            cache['labels'] = [None if a is None else next(mapped) for a in self._history_anchors]
+            self._geom_dirty = False
+        if self._temp_dirty:
+            cache['temp_poly'] = QtGui.QPolygonF(self.temp_points)
+            cache['temp_view'] = list(self._img_to_view_xform.map(QtGui.QPolygonF(self.temp_points)))
+            self._temp_dirty = False
+        return cache
+
+    def _drawLinesOutlined(self, painter, lines: list, polys: list, outline: QtGui.QPen, inner: QtGui.QPen):
+        # line items in one drawLines, polylines as joined paths; outline under, inner over
+        for pen in (outline, inner):
+            painter.setPen(pen)
+            if lines:
+                painter.drawLines(lines)
+            for poly in polys:
+                painter.drawPolyline(poly)
+
+    def _drawMeasurements(self, painter, geom: dict, history=True, temp=True, handles=False):
+        # pass 1: every outline (history + temp), pass 2: every inner line
+        temp = temp and self._tempSegmentsVisible()
+        lines = self._history_lines if history else []
+        polys = self._history_polys if history else []
+        if temp:
+            polys = polys + [geom['temp_poly']]
+        # segments are image-space; cosmetic pens keep their width under the zoom transform
+        painter.setWorldTransform(self._img_to_view_xform)
+        self._drawLinesOutlined(painter, lines, polys, self._pen_outline, self._pen_inner)
+        painter.resetTransform()
+        # labels go on top of all lines
+        if history:
+            for item, pos in zip(self.history, geom['labels']):
+                if pos is not None:
+                    self._drawItemLabel(painter, item, pos)
+        if handles:
+            for i, vpt in enumerate(geom['temp_view']):
+                self._drawHandle(painter, vpt, label=str(i+1))
+        if temp:
+            self._drawTempLabel(painter, geom)
+
+    def _drawItemLabel(self, painter, item: 'MeasureItem', pos: QtCore.QPointF):
+        # label path/box are built once per text and reused on every repaint
+        cache = item._label_cache
+        if cache is None or cache[0] != item.length_units_str:
+            cache = item._label_cache = (item.length_units_str,) + label_shape(item.length_units_str)
+        text, path, rect = cache
+        self._drawFloatingText(painter, pos, text, (path, rect))
+
+    def _tempSegmentsVisible(self) -> bool:
+        n = len(self.temp_points)
+        return (self.mode in ('line', 'calibrate') and n == 2) or (self.mode == 'polyline' and n >= 2)
+
+    def _tempLabelText(self) -> str:
+        # temp points are only appended or cleared, so count + first/last point identify the path
+        pts = self.temp_points
+        key = (self.mode, len(pts), pts[0].x(), pts[0].y(), pts[-1].x(), pts[-1].y(),
+               self.scale_units_per_px, self.units)
+        if self._last_temp_label is None or self._last_temp_label[0] != key:
+            if self.mode in ('line', 'calibrate'):
+                length_units = self.unitsDistance(pts[0], pts[1])
+            else:
+                length_units = polyline_length(flat_xy(pts)) * self.scale_units_per_px
+            self._last_temp_label = (key, self._fmt_len(length_units))
+        return self._last_temp_label[1]
+
+    def _drawTempLabel(self, painter, geom: dict):
+        view = geom['temp_view']
+        if self.mode in ('line', 'calibrate'):
+            pos = (view[0] + view[1]) * 0.5 + QtCore.QPointF(6, -6)
+        else:
+            pos = view[-1] + QtCore.QPointF(8, -8)
+        self._drawFloatingText(painter, pos, self._tempLabelText())
+
+    def _itemLines(self, item: 'MeasureItem', out: list):
+        # image-space QLineF per segment, straight from the item's flat coordinates
+        if item.drawable():
+            xy = item.xy
+            for j in range(0, len(xy) - 2, 2):
+                out.append(QtCore.QLineF(xy[j], xy[j+1], xy[j+2], xy[j+3]))
+
+    def _labelAnchor(self, item: 'MeasureItem'):
+        # image-space point the length label hangs off (None if the item is not drawable)
+        if not item.drawable():
+            return None
+        if item.kind == 'line':
+            x1, y1, x2, y2 = item.xy
+            return QtCore.QPointF((x1 + x2) * 0.5, (y1 + y2) * 0.5)
+        return polyline_halfway(item.xy, item.segLengths())
+
+    def _drawFloatingText(self, painter, view_pt: QtCore.QPointF, text: str, shape=None):
+        # shape: (path, rect) from label_shape(); pass a cached one to skip font metrics
+        path, rect = shape or label_shape(text)
+        painter.setFont(self._font_label)
+        painter.translate(view_pt)
         # shadow box
         painter.setPen(QtCore.Qt.NoPen)
-        painter.setBrush(QtGui.QColor(0,0,0,180))
-        metrics = QtGui.QFontMetrics(font)
-        w = metrics.horizontalAdvance(text) + 8
-        h = metrics.height() + 2
-        rect = QtCore.QRectF(view_pt.x(), view_pt.y()-h, w, h)
-        path = QtGui.QPainterPath()
-        path.addRoundedRect(rect, 4, 4)
+        painter.setBrush(self._brush_label_bg)
         painter.drawPath(path)
-        painter.setPen(QtGui.QColor(255,255,255))
+        painter.setPen(self._pen_label_text)
         painter.drawText(rect.adjusted(4, 0, -4, 0), QtCore.Qt.AlignmentFlag.AlignVCenter, text)
+        painter.translate(-view_pt.x(), -view_pt.y())
 
     def _fmt_len(self, value: float) -> str:
         if self.units == 'px':
@@ -297,37 +656,43 @@ class ImageView(QtWidgets.QWidget):
     # ---------- history ops ----------
     def clearHistory(self):
         if self.history:
-            self.history.clear()
+            self.historyModel.clear()
             self.temp_points = []
             self.guide_anchor_img = None
+            self._syncHistoryArrays()
             self.update()
             self.statusMessage.emit("Measurements cleared")
             self.historyChanged.emit()
 
     def undoLast(self):
         if self.history:
-            self.history.pop()
+            self.historyModel.removeIndices([len(self.history) - 1])
+            self._syncHistoryArrays()
             self.update()
             self.statusMessage.emit("Last measurement undone")
             self.historyChanged.emit()
 
     def deleteByIndices(self, indices):
-        if not indices:
+        rows = sorted(i for i in set(indices) if 0 <= i < len(self.history))
+        if not rows:
             return
-        for idx in sorted(set(indices), reverse=True):
-            if 0 <= idx < len(self.history):
-                self.history.pop(idx)
+        self.historyModel.removeIndices(rows)
+        self._syncHistoryArrays()
         self.update()
         self.statusMessage.emit("Selected measurement(s) deleted")
         self.historyChanged.emit()
 
     def clearImageAndHistory(self):
         self.image = QtGui.QImage()
+        self._image_pixmap = QtGui.QPixmap()
+        self._scaled_pm = None
         self._zoom = 1.0
         self._pan  = QtCore.QPointF(0,0)
         self.temp_points.clear()
-        self.history.clear()
+        self.historyModel.clear()
         self.guide_anchor_img = None
+        self._updateTransform()
+        self._syncHistoryArrays()
         self.update()
         self.statusMessage.emit("Image and measurements cleared")
         self.historyChanged.emit()
@@ -336,17 +701,17 @@ class ImageView(QtWidgets.QWidget):
         """Recompute all history item lengths using current scale_units_per_px and units."""
         if not self.history:
             return
-        for item in self.history:
-            length_px = 0.0
-            if item.kind == 'line' and len(item.points) == 2:
-                length_px = self.pxDistance(item.points[0], item.points[1])
-            elif item.kind == 'polyline' and len(item.points) >= 2:
-                for i in range(len(item.points)-1):
-                    length_px += self.pxDistance(item.points[i], item.points[i+1])
-            length_units = length_px * self.scale_units_per_px
+        # pixel lengths never change, only the scale: one multiply per item
+        scale, units = self.scale_units_per_px, self.units
+        for item, length_px in zip(self.history, self._history_px):
+            length_units = length_px * scale
             item.length_value = length_units
-            item.units = self.units
+            item.units = units
             item.length_units_str = self._fmt_len(length_units)
+            item._label_cache = None
+            item._display_text = None
+        self._history_rev += 1  # label text changed
+        self.historyModel.refresh()
         self.historyChanged.emit()
         self.update()
 
@@ -367,35 +732,15 @@ class ImageView(QtWidgets.QWidget):
         # temporarily force identity transform for image-space drawing
         old_zoom, old_pan = self._zoom, self._pan
         self._zoom, self._pan = 1.0, QtCore.QPointF(0,0)
+        self._updateTransform()
+        geom = self._viewGeometry()
 
-        # draw persisted measurements
-        for item in self.history:
-            self._drawMeasuredItem(painter, item)
-
-        # draw current temp geometry (if any complete)
-        pen_outline = QtGui.QPen(QtGui.QColor(0,0,0,220), 4); pen_outline.setCosmetic(True)
-        pen_temp    = QtGui.QPen(QtGui.QColor(0,200,255), 2); pen_temp.setCosmetic(True)
-
-        if self.temp_points:
-            if self.mode in ('line','calibrate') and len(self.temp_points) == 2:
-                a, b = self.temp_points
-                painter.setPen(pen_outline); self._drawSegment(painter, a, b)
-                painter.setPen(pen_temp);    self._drawSegment(painter, a, b)
-                mid = (a + b) * 0.5
-                length_units = self.unitsDistance(a, b)
-                self._drawFloatingText(painter, mid + QtCore.QPointF(6, -6), self._fmt_len(length_units))
-            elif self.mode == 'polyline' and len(self.temp_points) >= 2:
-                total = 0.0
-                for i in range(len(self.temp_points)-1):
-                    a, b = self.temp_points[i], self.temp_points[i+1]
-                    painter.setPen(pen_outline); self._drawSegment(painter, a, b)
-                    painter.setPen(pen_temp);    self._drawSegment(painter, a, b)
-                    total += self.unitsDistance(a, b)
-                self._drawFloatingText(painter, self.temp_points[-1] + QtCore.QPointF(8, -8),
-                                       self._fmt_len(total))
+        # draw persisted measurements + current temp geometry (if any complete)
+        self._drawMeasurements(painter, geom)
 
         # restore view transform
         self._zoom, self._pan = old_zoom, old_pan
+        self._updateTransform()
         painter.end()
         ok = annotated.save(path)
         if ok:
@@ -414,19 +759,19 @@ class ImageView(QtWidgets.QWidget):
         if e.button() == QtCore.Qt.MouseButton.RightButton:
             if self.mode == 'polyline' and len(self.temp_points) >= 2:
                 # finalize polyline
-                total = 0.0
-                for i in range(len(self.temp_points)-1):
-                    total += self.unitsDistance(self.temp_points[i], self.temp_points[i+1])
+                total = polyline_length(flat_xy(self.temp_points)) * self.scale_units_per_px
                 item = MeasureItem('polyline', self.temp_points, self._fmt_len(total), total, self.units)
-                self.history.append(item)
+                self.historyModel.append(item)
                 self.measureAdded.emit(item)
                 self.historyChanged.emit()
                 self.temp_points = []
+                self._syncHistoryArrays()
                 self.update()
                 return
             # cancel
             self.temp_points = []
             self.mode = 'idle'
+            self._invalidateTemp()
             self.update()
             return
 
@@ -442,6 +787,7 @@ class ImageView(QtWidgets.QWidget):
 
             if self.mode in ('calibrate', 'line', 'polyline'):
                 self.temp_points.append(imgpt)
+                self._invalidateTemp()
                 if self.mode in ('calibrate', 'line') and len(self.temp_points) == 2:
                     if self.mode == 'calibrate':
                         self.finishCalibration()
@@ -449,10 +795,11 @@ class ImageView(QtWidgets.QWidget):
                         a, b = self.temp_points
                         length_units = self.unitsDistance(a, b)
                         item = MeasureItem('line', [a, b], self._fmt_len(length_units), length_units, self.units)
-                        self.history.append(item)
+                        self.historyModel.append(item)
                         self.measureAdded.emit(item)
                         self.historyChanged.emit()
                         self.temp_points = []
+                        self._syncHistoryArrays()
                     self.update()
                 else:
                     self.update()
@@ -461,12 +808,17 @@ class ImageView(QtWidgets.QWidget):
         if self._dragging:
             delta = e.position().toPoint() - self._drag_origin
             self._pan = self._pan_origin + QtCore.QPointF(delta.x(), delta.y())
-            self.update()
+            self._updateTransform()
+            self._scheduleFrame()
             return
         if not self.image.isNull():
             imgpt = self.viewToImage(e.position())
             self.statusMessage.emit(f"Cursor: {imgpt.x():.1f}, {imgpt.y():.1f} px | Scale: {self.scale_units_per_px:.6f} {self.units}/px")
 
+    def _scheduleFrame(self):
+        if not self._repaint_timer.isActive():
+            self._repaint_timer.start()
+
     def mouseReleaseEvent(self, e: QtGui.QMouseEvent):
         if e.button() == QtCore.Qt.MouseButton.MiddleButton or (e.button()==QtCore.Qt.LeftButton and self._space_down):
             self._dragging = False
@@ -483,9 +835,9 @@ class ImageView(QtWidgets.QWidget):
         cursor_view = e.position()
         img_before = self.viewToImage(cursor_view)
         self._zoom = new_zoom
-        cursor_view_after = self.imageToView(img_before)
-        shift = cursor_view - cursor_view_after
-        self._pan += shift
+        # keep the image point under the cursor fixed
+        self._pan = cursor_view - img_before * new_zoom
+        self._updateTransform()
         self.update()
 
     def keyPressEvent(self, e: QtGui.QKeyEvent):
@@ -499,34 +851,16 @@ class ImageView(QtWidgets.QWidget):
         if key == QtCore.Qt.Key.Key_Escape:
             self.temp_points = []
             self.mode = 'idle'
+            self._invalidateTemp()
             self.update()
             return
 
         if key == QtCore.Qt.Key.Key_R:
-            self._zoom = 1.0
-            self._pan  = QtCore.QPointF(0,0)
-            self.update()
-            return
-
-        if key == QtCore.Qt.Key.Key_C:
-            self.mode = 'calibrate'
-            self.temp_points = []
-            self.statusMessage.emit("Calibration: click two points, then enter known length")
-            self.update()
+            self.resetView()
             return
 
-        if key == QtCore.Qt.Key.Key_L:
-            self.mode = 'line'
-            self.temp_points = []
-            self.statusMessage.emit("Line: click two points to measure")
-            self.update()
-            return
-
-        if key == QtCore.Qt.Key.Key_P:
-            self.mode = 'polyline'
-            self.temp_points = []
-            self.statusMessage.emit("Polyline: click points; right-click to finish")
-            self.update()
+        if key in self._MODE_KEYS:
+            self.setMode(self._MODE_KEYS[key])
             return
 
         if (mod & QtCore.Qt.KeyboardModifier.ControlModifier) and key == QtCore.Qt.Key.Key_Z:
@@ -534,8 +868,7 @@ class ImageView(QtWidgets.QWidget):
             return
 
         if (mod & QtCore.Qt.KeyboardModifier.ControlModifier) and key == QtCore.Qt.Key.Key_V:
-            if not self.pasteFromClipboard():
-                self.statusMessage.emit("Clipboard does not contain an image")
+            self.pasteImage()
             return
 
         if (mod & QtCore.Qt.KeyboardModifier.ControlModifier) and key == QtCore.Qt.Key.Key_O:
@@ -548,6 +881,35 @@ class ImageView(QtWidgets.QWidget):
 
         super().keyPressEvent(e)
 
+    # ---------- actions (keys and side panel buttons) ----------
+    _MODE_KEYS = {
+        QtCore.Qt.Key.Key_C: 'calibrate',
+        QtCore.Qt.Key.Key_L: 'line',
+        QtCore.Qt.Key.Key_P: 'polyline',
+    }
+    _MODE_HINTS = {
+        'calibrate': "Calibration: click two points, then enter known length",
+        'line':      "Line: click two points to measure",
+        'polyline':  "Polyline: click points; right-click to finish",
+    }
+
+    def setMode(self, mode: str):
+        self.mode = mode
+        self.temp_points = []
+        self._invalidateTemp()
+        self.statusMessage.emit(self._MODE_HINTS[mode])
+        self.update()
+
+    def resetView(self):
+        self._zoom = 1.0
+        self._pan  = QtCore.QPointF(0,0)
+        self._updateTransform()
+        self.update()
+
+    def pasteImage(self):
+        if not self.pasteFromClipboard():
+            self.statusMessage.emit("Clipboard does not contain an image")
+
     def keyReleaseEvent(self, e: QtGui.QKeyEvent):
         if e.key() == QtCore.Qt.Key.Key_Space:
             self._space_down = False
@@ -563,11 +925,13 @@ class ImageView(QtWidgets.QWidget):
             self.statusMessage.emit("Calibration failed: zero distance")
             self.temp_points = []
             self.mode = 'idle'
+            self._invalidateTemp()
             return
         length, ok = QtWidgets.QInputDialog.getDouble(self, "Calibration", "Real length:", 100.0, 0.000001, 1e12, 6)
         if not ok:
             self.temp_points = []
             self.mode = 'idle'
+            self._invalidateTemp()
             self.update()
             return
         units, ok2 = QtWidgets.QInputDialog.getText(self, "Calibration", "Units (e.g., mm, cm, m, in):", text=(self.units if self.units!='px' else 'mm'))
@@ -575,11 +939,13 @@ class ImageView(QtWidgets.QWidget):
             units = self.units if self.units!='px' else 'units'
         self.units = units.strip()
         self.scale_units_per_px = length / dpx
+        self.scaleChanged.emit(self.scale_units_per_px, self.units)
         self.statusMessage.emit(f"Calibrated: {self.scale_units_per_px:.6f} {self.units}/px (dpx={dpx:.2f})")
         # Recalculate existing measurements to new scale/units
         self.recalcHistoryAfterCalibration()
         self.temp_points = []
         self.mode = 'idle'
+        self._invalidateTemp()
         self.update()
 
     def openImageDialog(self):
@@ -598,13 +964,15 @@ class ImageView(QtWidgets.QWidget):
         path, _ = QtWidgets.QFileDialog.getSaveFileName(self, "Export CSV", "measurements.csv", "CSV Files (*.csv)")
         if not path:
             return
-        with open(path, 'w', newline='', encoding='utf-8') as f:
-            w = csv.writer(f, delimiter=';')
-            w.writerow(["timestamp","kind","units","length_value","length_label","points"])
-            for item in self.history:
-                pts = "|".join([f"{p.x():.2f},{p.y():.2f}" for p in item.points])
-                w.writerow([item.timestamp.isoformat(), item.kind, item.units, f"{item.length_value:.6f}", item.length_units_str, pts])
-        self.statusMessage.emit(f"Exported {len(self.history)} items to {os.path.basename(path)}")
+        # snapshot plain values on the GUI thread; the worker touches no Qt objects
+        # (item.xy arrays are never mutated after creation)
+        rows = [(item.timestamp.isoformat(), item.kind, item.units, item.length_value, item.length_units_str, item.xy)
+                for item in self.history]
+        signals = TaskSignals(self)  # parented to the view so it outlives the runnable
+        signals.finished.connect(self.statusMessage)
+        signals.finished.connect(signals.deleteLater)
+        QtCore.QThreadPool.globalInstance().start(CsvExportTask(path, rows, signals))
+        self.statusMessage.emit(f"Exporting {len(rows)} items...")
 
 class SidePanel(QtWidgets.QWidget):
     def __init__(self, view: ImageView, parent=None):
@@ -612,10 +980,14 @@ class SidePanel(QtWidgets.QWidget):
         self.view = view
         self.setFixedWidth(340)
 
-        self.list = QtWidgets.QListWidget()
+        # rows come straight from view.history: no per-row widget items
+        self.list = QtWidgets.QListView()
+        self.list.setModel(self.view.historyModel)
+        self.list.setUniformItemSizes(True)
         self.list.setSelectionMode(QtWidgets.QAbstractItemView.SelectionMode.ExtendedSelection)
 
         self.lblScale = QtWidgets.QLabel("Scale: 1.000000 units/px, units=px")
+        self._lastScaleText = None
         self.lblHint  = QtWidgets.QLabel("Hotkeys: C/L/P, Ctrl+V/O/E, Ctrl+Z, R, Esc\nPan: MMB drag or hold Space + LMB\nRight-click to finish polyline.")
         self.lblHint.setStyleSheet("color: #aaa;")
 
@@ -638,14 +1010,14 @@ class SidePanel(QtWidgets.QWidget):
         self.chkV.setChecked(True)
         self.chkDiag.setChecked(True)
 
-        btnCal.clicked.connect(lambda: self._emitKey(QtCore.Qt.Key.Key_C))
-        btnLine.clicked.connect(lambda: self._emitKey(QtCore.Qt.Key.Key_L))
-        btnPoly.clicked.connect(lambda: self._emitKey(QtCore.Qt.Key.Key_P))
-        btnPaste.clicked.connect(lambda: self._emitKey(QtCore.Qt.Key.Key_V, ctrl=True))
-        btnOpen.clicked.connect(lambda: self._emitKey(QtCore.Qt.Key.Key_O, ctrl=True))
-        btnExport.clicked.connect(lambda: self._emitKey(QtCore.Qt.Key.Key_E, ctrl=True))
+        btnCal.clicked.connect(lambda: self.view.setMode('calibrate'))
+        btnLine.clicked.connect(lambda: self.view.setMode('line'))
+        btnPoly.clicked.connect(lambda: self.view.setMode('polyline'))
+        btnPaste.clicked.connect(self.view.pasteImage)
+        btnOpen.clicked.connect(self.view.openImageDialog)
+        btnExport.clicked.connect(self.view.exportCSV)
         btnExportImg.clicked.connect(self.view.exportAnnotatedImage)
-        btnReset.clicked.connect(lambda: self._emitKey(QtCore.Qt.Key.Key_R))
+        btnReset.clicked.connect(self.view.resetView)
         btnUndo.clicked.connect(self.onUndo)
         btnDelSel.clicked.connect(self.onDeleteSelected)
         btnClearM.clicked.connect(self.onClearMeasurements)
@@ -681,32 +1053,16 @@ class SidePanel(QtWidgets.QWidget):
         layout.addWidget(self.list, 1)
 
         # signals
-        self.view.measureAdded.connect(self.onMeasureAdded)
-        self.view.historyChanged.connect(self.refreshListFromHistory)
-        self.view.statusMessage.connect(self.onStatus)
-
-        # periodic scale label update
-        self._timer = QtCore.QTimer(self)
-        self._timer.timeout.connect(self.refreshScale)
-        self._timer.start(300)
+        self.view.statusShown.connect(self.onStatus)
+        self.view.scaleChanged.connect(self._onScaleChanged)
 
-        QtCore.QTimer.singleShot(0, self.refreshListFromHistory)
+        QtCore.QTimer.singleShot(0, self.refreshScale)
 
-        # allow Delete key on the list to remove selected
-        self.list.keyPressEvent = self._listKeyPressWrap(self.list.keyPressEvent)
-
-    def _listKeyPressWrap(self, orig):
-        def handler(e: QtGui.QKeyEvent):
-            if e.key() in (QtCore.Qt.Key.Key_Delete, QtCore.Qt.Key.Key_Backspace):
-                self.onDeleteSelected()
-                return
-            return orig(e)
-        return handler
-
-    def _emitKey(self, key, ctrl=False):
-        ev = QtGui.QKeyEvent(QtCore.QEvent.Type.KeyPress, key,
-                             (QtCore.Qt.KeyboardModifier.ControlModifier if ctrl else QtCore.Qt.KeyboardModifier.NoModifier))
-        QtWidgets.QApplication.postEvent(self.view, ev)
+        # allow Delete/Backspace on the list to remove selected
+        for key in (QtCore.Qt.Key.Key_Delete, QtCore.Qt.Key.Key_Backspace):
+            sc = QtGui.QShortcut(QtGui.QKeySequence(key), self.list)
+            sc.setContext(QtCore.Qt.ShortcutContext.WidgetShortcut)
+            sc.activated.connect(self.onDeleteSelected)
 
     def onGuidesChanged(self, state):
         self.view.guide_h_enabled = self.chkH.isChecked()
@@ -714,18 +1070,11 @@ class SidePanel(QtWidgets.QWidget):
         self.view.guides_diag_enabled = self.chkDiag.isChecked()
         self.view.update()
 
-    def refreshListFromHistory(self):
-        self.list.clear()
-        for item in self.view.history:
-            ts = item.timestamp.strftime("%H:%M:%S")
-            text = f"[{ts}] {item.kind}: {item.length_units_str} ({len(item.points)} pts)"
-            self.list.addItem(text)
-
     def onUndo(self):
         self.view.undoLast()
 
     def onDeleteSelected(self):
-        rows = sorted({i.row() for i in self.list.selectedIndexes()})
+        rows = sorted({i.row() for i in self.list.selectionModel().selectedIndexes()})
         if rows:
             self.view.deleteByIndices(rows)
 
@@ -735,15 +1084,30 @@ class SidePanel(QtWidgets.QWidget):
     def onClearAll(self):
         self.view.clearImageAndHistory()
 
-    def onMeasureAdded(self, item: MeasureItem):
-        # keep list indices aligned with history by full refresh
-        self.refreshListFromHistory()
-
     def onStatus(self, msg: str):
         self.lblHint.setText(msg)
 
     def refreshScale(self):
-        self.lblScale.setText(f"Scale: {self.view.scale_units_per_px:.6f} {self.view.units}/px, units={self.view.units}")
+        self._onScaleChanged(self.view.scale_units_per_px, self.view.units)
+
+    def _onScaleChanged(self, scale: float, units: str):
+        # setText relayouts the label even for identical text
+        txt = f"Scale: {scale:.6f} {units}/px, units={units}"
+        if txt != self._lastScaleText:
+            self._lastScaleText = txt
+            self.lblScale.setText(txt)
+
+# ---------- app icon ----------
+_app_icon = None
+
+def _load_app_icon():
+    """Window/app icon from resources, falling back to icon2.ico in the working directory (loaded once)."""
+    global _app_icon
+    if _app_icon is None:
+        _app_icon = QtGui.QIcon(":/icon2.ico")
+        if _app_icon.isNull():
+            _app_icon = QtGui.QIcon("icon2.ico")
+    return _app_icon
 
 class MainWindow(QtWidgets.QMainWindow):
     def __init__(self):
@@ -752,45 +1116,67 @@ class MainWindow(QtWidgets.QMainWindow):
         self.resize(1200, 800)
         
         # Установка иконки окна
-        try:
-            # Сначала пробуем загрузить из ресурсов
-            self.setWindowIcon(QtGui.QIcon(":/icon2.ico"))
-        except:
-            # Если не удалось, пробуем загрузить из файла
-            icon_path = "icon2.ico"
-            if os.path.exists(icon_path):
-                self.setWindowIcon(QtGui.QIcon(icon_path))
+        self.setWindowIcon(_load_app_icon())
         self.view = ImageView()
-        self.side = SidePanel(self.view)
+        self.side = None           # built after the first frame, see _finishInit
         w = QtWidgets.QWidget()
-        lay = QtWidgets.QHBoxLayout(w)
-        lay.setContentsMargins(0,0,0,0)
-        lay.addWidget(self.view, 1)
-        lay.addWidget(self.side)
+        self._layout = QtWidgets.QHBoxLayout(w)
+        self._layout.setContentsMargins(0,0,0,0)
+        self._layout.addWidget(self.view, 1)
+        # reserve the side panel's width so the view does not jump when it arrives
+        self._sidePlaceholder = QtWidgets.QWidget()
+        self._sidePlaceholder.setFixedWidth(340)
+        self._layout.addWidget(self._sidePlaceholder)
         self.setCentralWidget(w)
         self.status = self.statusBar()
-        self.view.statusMessage.connect(self.status.showMessage)
+        # plain label: setText schedules a repaint instead of showMessage's immediate one
+        self._statusLabel = QtWidgets.QLabel()
+        self.status.addPermanentWidget(self._statusLabel, 1)
+        self.view.statusShown.connect(self._statusLabel.setText)
+
+        self._clipboard = QtGui.QGuiApplication.clipboard()
+
+        # side panel and auto-paste are set up after the view's first paint, see eventFilter
+        self.view.installEventFilter(self)
+
+    def eventFilter(self, obj, e):
+        if obj is self.view and e.type() == QtCore.QEvent.Type.Paint:
+            self.view.removeEventFilter(self)
+            QtCore.QTimer.singleShot(0, self._finishInit)  # runs once this paint has finished
+        return super().eventFilter(obj, e)
+
+    def _finishInit(self):
+        # side panel (buttons, list, labels) is wired once the first frame is on screen
+        self.side = SidePanel(self.view)
+        self._layout.replaceWidget(self._sidePlaceholder, self.side)
+        self._sidePlaceholder.deleteLater()
+        self._sidePlaceholder = None
+
+        # Auto-paste from clipboard on start, and later whenever an image arrives while the canvas is empty;
+        # after the side panel is connected so both status labels show the result
+        self._clipboard.dataChanged.connect(self._onClipboardChanged)
+        self.tryAutoPaste()
+
+    def _clipboardHasImage(self) -> bool:
+        # mime check only; the image itself is fetched by pasteFromClipboard
+        md = self._clipboard.mimeData()
+        return md is not None and md.hasImage()
 
-        # Auto-paste from clipboard on start
-        QtCore.QTimer.singleShot(100, self.tryAutoPaste)
+    def _onClipboardChanged(self):
+        # never replace an image the user is already measuring on
+        if self.view.image.isNull() and self._clipboardHasImage():
+            self.view.pasteFromClipboard()
 
     def tryAutoPaste(self):
-        if not self.view.pasteFromClipboard():
-            self.status.showMessage("Tip: Copy a screenshot (Win+Shift+S), then press Ctrl+V here. Or use Ctrl+O to open a file.")
+        if not (self._clipboardHasImage() and self.view.pasteFromClipboard()):
+            self._statusLabel.setText("Tip: Copy a screenshot (Win+Shift+S), then press Ctrl+V here. Or use Ctrl+O to open a file.")
 
 def main():
     import sys
     app = QtWidgets.QApplication(sys.argv)
     
     # Установка иконки для всего приложения
-    try:
-        # Сначала пробуем загрузить из ресурсов
-        app.setWindowIcon(QtGui.QIcon(":/icon2.ico"))
-    except:
-        # Если не удалось, пробуем загрузить из файла
-        icon_path = "icon2.ico"
-        if os.path.exists(icon_path):
-            app.setWindowIcon(QtGui.QIcon(icon_path))
+    app.setWindowIcon(_load_app_icon())
     
     win = MainWindow()
     win.show()
@@ -1,7 +1,11 @@
 #!/usr/bin/env python3
 # Тестовый скрипт для проверки иконки
+# Запуск (из папки source, где лежат resources_rc.py и icon2.ico):
+#   SM_DIAG=1 python ../tools/test_icon.py
 
+import os
 import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "source"))
 from PySide6 import QtCore, QtGui, QtWidgets
 
 class IconTestWindow(QtWidgets.QMainWindow):
@@ -21,7 +25,6 @@ class IconTestWindow(QtWidgets.QMainWindow):
             print(f"Ошибка загрузки иконки из ресурсов: {e}")
             
             # Попытка загрузить из файла
-            import os
             icon_path = "icon2.ico"
             if os.path.exists(icon_path):
                 self.setWindowIcon(QtGui.QIcon(icon_path))
@@ -43,7 +46,6 @@ def main():
         print(f"Ошибка загрузки иконки приложения из ресурсов: {e}")
         
         # Попытка загрузить из файла
-        import os
         icon_path = "icon2.ico"
         if os.path.exists(icon_path):
             app.setWindowIcon(QtGui.QIcon(icon_path))
@@ -57,5 +59,6 @@ def main():
     print("Тестовое окно открыто. Проверьте наличие иконки.")
     sys.exit(app.exec())
 
-if __name__ == "__main__":
+# без SM_DIAG=1 случайный запуск ничего не делает
+if __name__ == "__main__" and os.environ.get("SM_DIAG") == "1":
     main()
\ No newline at end of file